@@ -2,23 +2,42 @@
 """Configuration management for rt_autodl."""
 
 import json
+import re
 from typing import Any, Dict
 
+# Comment-aware JSON parser, resolved once: jsonc, then json-with-comments, then plain json
+try:
+    import jsonc as _jsonc  # type: ignore
+except ImportError:
+    try:
+        from json_with_comments import json as _jsonc  # type: ignore
+    except ImportError:
+        _jsonc = json
+
+# Optional fast path: strip comments ourselves and parse the bytes with orjson
+try:
+    import orjson as _orjson  # type: ignore
+except ImportError:
+    _orjson = None
+
+# String literals are matched first so "//" inside e.g. URIs survives
+_COMMENT_RE = re.compile(rb'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.S)
+
+
+def _parse_config(raw: bytes) -> Dict[str, Any]:
+    """Parse JSON-with-comments bytes, preferring orjson when installed."""
+    if _orjson is not None:
+        try:
+            return _orjson.loads(_COMMENT_RE.sub(lambda m: m.group(1) or b"", raw))
+        except _orjson.JSONDecodeError:
+            pass  # e.g. trailing commas; let the comment-aware parser decide
+    return _jsonc.loads(raw.decode("utf-8"))
+
 
 def load_config(path: str) -> Dict[str, Any]:
     """Load and validate configuration from JSON file (with optional comment support)."""
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            import jsonc  # type: ignore
-            cfg = jsonc.load(f)
-        except ImportError:
-            try:
-                from json_with_comments import json as jsonc  # type: ignore
-                f.seek(0)
-                cfg = jsonc.load(f)
-            except ImportError:
-                f.seek(0)
-                cfg = json.load(f)
+    with open(path, "rb") as f:
+        cfg = _parse_config(f.read())
 
     # Handle both legacy single label format and new multiple mappings format
     if "label_mappings" in cfg:
@@ -62,10 +81,12 @@ def load_config(path: str) -> Dict[str, Any]:
     s.setdefault("ftps_pasv", True)
     s.setdefault("ftps_tls_verify", True)
     s.setdefault("ftps_timeout", 30)
-    s.setdefault("ftps_blocksize", 262144)
+    s.setdefault("ftps_blocksize", 1024 * 1024)
     s.setdefault("ftps_segments", 4)
     s.setdefault("ftps_min_seg_size", 8 * 1024 * 1024)
     s.setdefault("ftps_file_concurrency", 1)
+    s.setdefault("ftps_torrent_concurrency", 1)
+    s.setdefault("ftps_direct_io", False)
     s.setdefault("ftp_root", "/")
     s.setdefault("rtorrent_root", None)
 
@@ -106,7 +127,8 @@ def _validate_config(cfg: Dict[str, Any]) -> None:
         "ftps_blocksize": (1024, 10 * 1024 * 1024),
         "ftps_segments": (1, 32),
         "ftps_min_seg_size": (1024, 100 * 1024 * 1024),
-        "ftps_file_concurrency": (1, 16)
+        "ftps_file_concurrency": (1, 16),
+        "ftps_torrent_concurrency": (1, 8)
     }
     
     for field, (min_val, max_val) in numeric_fields.items():
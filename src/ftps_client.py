@@ -2,14 +2,19 @@
 """FTPS client functionality for rt_autodl."""
 
 import concurrent.futures
+import contextlib
 import ftplib
+import functools
 import mmap
 import os
 import posixpath
+import socket
 import ssl
+import sys
 import threading
+import time
 import unicodedata
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from rich.console import Console
 from rich.progress import Progress
@@ -20,9 +25,28 @@ except ImportError:
     from utils import retry_on_failure, vprint, ensure_dir, posix_norm, join_posix
 
 
+# Shared console for verbose messages (Console() probes the terminal on construction)
+_CONSOLE = Console()
+
+# Files above _BIG_FILE get blocks of rsize/64, up to _MAX_BLOCKSIZE (per segment buffer)
+_BIG_FILE = 128 * 1024 * 1024
+_MAX_BLOCKSIZE = 8 * 1024 * 1024
+
+# O_DIRECT needs buffer address, length and file offset aligned to the logical block size
+_DIRECT_ALIGN = 4096
+# Maximum TLS record payload; blocks are kept a whole number of records
+_TLS_RECORD = 16 * 1024
+
+
+# Lead characters of latin-1-decoded UTF-8 for U+0080..U+00FF ("Ã¡" for "á", "Â©" for "©")
+_MOJIBAKE_MARKERS = frozenset("ÃÂ")
+
+
+@functools.lru_cache(maxsize=4096)
 def _normalize_filename(filename: str) -> str:
     """Normalize filename for comparison by handling Unicode normalization and encoding issues."""
-    if not filename:
+    if not filename or filename.isascii():
+        # ASCII is already NFC and can't carry mojibake
         return filename
     
     # First normalize Unicode to NFC form
@@ -32,7 +56,7 @@ def _normalize_filename(filename: str) -> str:
     # This handles cases like "guardiÃ¡n" -> "guardián"
     try:
         # Try to detect if this might be mojibake by encoding as latin-1 and decoding as utf-8
-        if 'Ã' in normalized:  # Common mojibake indicator
+        if not _MOJIBAKE_MARKERS.isdisjoint(normalized):  # Common mojibake indicators
             latin1_bytes = normalized.encode('latin-1')
             utf8_decoded = latin1_bytes.decode('utf-8')
             # If successful and the result is different, use the corrected version
@@ -45,6 +69,103 @@ def _normalize_filename(filename: str) -> str:
     return normalized
 
 
+# os.pwrite is POSIX-only; elsewhere (Windows) writes go through file objects
+_HAS_PWRITE = hasattr(os, "pwrite")
+
+
+def _pwrite_all(fd: int, data, pos: int) -> None:
+    """os.pwrite() until every byte of data landed at pos (pwrite may write short)."""
+    view = memoryview(data)
+    while view:
+        n = os.pwrite(fd, view, pos)
+        view = view[n:]
+        pos += n
+
+
+def _recv_fill(sock, view: memoryview) -> int:
+    """recv_into() until view is full or the peer closes; returns the byte count.
+    A TLS socket hands back at most one ~16 KiB record per call, so without this
+    every record would cost a write and a progress update."""
+    filled = 0
+    size = len(view)
+    while filled < size:
+        n = sock.recv_into(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def _tune_ctrlsock(sock) -> None:
+    """
+    Control channel: send commands without Nagle delay, and keep it alive while it
+    sits idle for the length of a large transfer (NAT/firewall idle timeouts).
+    """
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _libc_fallocate():
+    """fallocate(2) from libc via ctypes, or None (not Linux/glibc)."""
+    if not sys.platform.startswith("linux"):
+        return None  # CDLL(None) isn't even valid on Windows
+    try:
+        import ctypes
+        fn = ctypes.CDLL(None, use_errno=True).fallocate64
+    except (ImportError, OSError, AttributeError, TypeError):
+        return None
+    fn.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64)
+    fn.restype = ctypes.c_int
+    return fn
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve `size` bytes up front so segment workers don't contend on block allocation.
+
+    Calls fallocate(2) rather than posix_fallocate: where the filesystem can't allocate
+    without writing (ZFS before 2.2, NFSv3, many FUSE mounts) glibc's posix_fallocate
+    falls back to writing every block, doubling the I/O of a large download, while
+    fallocate just fails. There, and off Linux, the file is only sized (sparse ftruncate).
+    """
+    fallocate = _libc_fallocate()
+    if fallocate is None or fallocate(fd, 0, 0, size) != 0:
+        os.ftruncate(fd, size)
+
+
+def _open_direct(path: str) -> Optional[int]:
+    """Open path for O_DIRECT writes; None where the platform or filesystem (tmpfs, NFS) refuses it."""
+    flag = getattr(os, "O_DIRECT", 0)
+    if not flag:
+        return None
+    try:
+        return os.open(path, os.O_WRONLY | flag)
+    except OSError:
+        return None
+
+
+def _pwrite_direct(dfd: int, fd: int, view: memoryview, pos: int) -> None:
+    """Write an aligned block through the O_DIRECT fd; unaligned tails go through the buffered fd."""
+    n = 0
+    if len(view) % _DIRECT_ALIGN == 0:
+        n = os.pwrite(dfd, view, pos)
+    if n < len(view):
+        _pwrite_all(fd, view[n:], pos + n)
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """os.stat(path), or None if it can't be stat'ed (usually: doesn't exist)."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
 def _rel_from_frozen(frozen: str, rtorrent_root: Optional[str]) -> Optional[str]:
     """Return a POSIX relative path from frozen_path by stripping rtorrent_root if given; else None."""
     if not frozen:
@@ -62,6 +183,9 @@ def _rel_from_frozen(frozen: str, rtorrent_root: Optional[str]) -> Optional[str]
     return None
 
 
+_SIZE_KEYS = ("size_bytes", "length", "size")  # per-file size fields, in order of preference
+
+
 def ftps_plan_from_files(torrent: Dict[str, Any], ftp_root: str, rtorrent_root: Optional[str]) -> List[Tuple[str, str, int]]:
     """
     Return a list of (remote_abs_path_under_ftp_root, rel_path_for_dest, size).
@@ -77,8 +201,11 @@ def ftps_plan_from_files(torrent: Dict[str, Any], ftp_root: str, rtorrent_root:
     ftp_root = posix_norm(ftp_root or "/")
     
     # For multi-file torrents, use the torrent name as the base folder
-    torrent_name = torrent.get("name", "")
-    
+    # (remote and destination share the same relative structure)
+    base = torrent.get("name", "") if not is_single else ""
+    bytes_total = torrent.get("bytes_total") or torrent.get("size") or 0
+    append = plan.append
+
     for f in files:
         rel = f.get("path") or f.get("name")
         if not rel:
@@ -88,43 +215,81 @@ def ftps_plan_from_files(torrent: Dict[str, Any], ftp_root: str, rtorrent_root:
         rel = rel.lstrip("/")  # enforce relative under ftp_root
 
         size = 0
-        for key in ("size_bytes", "length", "size"):
+        for key in _SIZE_KEYS:
             v = f.get(key)
             if isinstance(v, int) and v > 0:
                 size = v
                 break
-        if size <= 0 and is_single:
-            v = torrent.get("bytes_total") or torrent.get("size") or 0
-            if isinstance(v, int) and v > 0:
-                size = v
+        if size <= 0 and is_single and isinstance(bytes_total, int) and bytes_total > 0:
+            size = bytes_total
 
-        # For multi-file torrents, prepend the torrent name to create the full remote path
-        if not is_single and torrent_name:
-            # Preserve the full relative path structure for multi-file torrents
-            remote_rel = join_posix(torrent_name, rel)
-            # Also preserve the folder structure in the destination path
-            dest_rel = join_posix(torrent_name, rel)
-        else:
-            remote_rel = rel
-            dest_rel = rel
-            
-        remote = join_posix(ftp_root, remote_rel)
-        plan.append((remote, dest_rel, int(size)))
+        dest_rel = join_posix(base, rel) if base else rel
+        append((join_posix(ftp_root, dest_rel), dest_rel, size))
     return plan
 
 
+@functools.lru_cache(maxsize=2)
+def _get_ssl_ctx(verify: bool) -> ssl.SSLContext:
+    """Build the TLS context once per verify mode; loading the trust store is the expensive part."""
+    ctx = ssl.create_default_context()
+    if not verify:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    ctx.options &= ~ssl.OP_NO_TICKET  # keep session tickets so reconnects can resume
+    return ctx
+
+
+# Last TLS session per (host, port) with the context it came from, offered on the next
+# control-channel handshake. A session only resumes under its own context (threads racing
+# on the first _get_ssl_ctx call can each end up with a different one).
+_TLS_SESSIONS: Dict[Tuple[str, int], Tuple[ssl.SSLContext, ssl.SSLSession]] = {}
+
+
+class _ResumingFTP_TLS(ftplib.FTP_TLS):
+    """FTP_TLS whose AUTH TLS handshake resumes the previous session to the same server."""
+
+    def auth(self):
+        if isinstance(self.sock, ssl.SSLSocket):
+            raise ValueError("Already using TLS")
+        resp = self.voidcmd('AUTH TLS')
+        sess_ctx, session = _TLS_SESSIONS.get((self.host, self.port), (None, None))
+        if sess_ctx is not self.context:
+            session = None
+        self.sock = self.context.wrap_socket(self.sock, server_hostname=self.host, session=session)
+        self.file = self.sock.makefile(mode='r', encoding=self.encoding)
+        return resp
+
+    def ntransfercmd(self, cmd, rest=None):
+        # Data channels resume the control channel's session: one abbreviated handshake
+        # per transfer, and servers enforcing session reuse (vsftpd require_ssl_reuse) accept it
+        conn, size = ftplib.FTP.ntransfercmd(self, cmd, rest)
+        if self._prot_p:
+            session = getattr(self.sock, "session", None)
+            conn = self.context.wrap_socket(conn, server_hostname=self.host, session=session)
+        return conn, size
+
+
 @retry_on_failure(max_attempts=3, delay=2.0)
 def ftps_connect(s: Dict[str, Any], ctx: ssl.SSLContext):
     """Establish FTPS connection."""
     timeout = int(s.get("ftps_timeout", 30))
     pasv = bool(s.get("ftps_pasv", True))
     try:
-        ftp = ftplib.FTP_TLS(timeout=timeout, context=ctx)
+        ftp = _ResumingFTP_TLS(timeout=timeout, context=ctx)
     except TypeError:
-        ftp = ftplib.FTP_TLS(timeout=timeout)  # older Python fallback
+        ftp = _ResumingFTP_TLS(timeout=timeout)  # older Python fallback
         ftp.context = ctx  # type: ignore[attr-defined]
     ftp.connect(s["ftps_host"], int(s.get("ftps_port", 21)))
+    _tune_ctrlsock(ftp.sock)
     ftp.login(user=s["ftps_user"], passwd=(s.get("ftps_password") or ""))
+    # Relative paths (ftp_root without a leading "/") are anchored here, wherever a
+    # pooled session was left
+    try:
+        ftp._rt_home = ftp.pwd()
+    except ftplib.Error:
+        ftp._rt_home = "/"
+    # TLS 1.3 tickets arrive after the handshake; by now the login reply has been read
+    _TLS_SESSIONS[(ftp.host, ftp.port)] = (ftp.sock.context, ftp.sock.session)
     ftp.prot_p()
     ftp.set_pasv(pasv)
     try:
@@ -134,218 +299,483 @@ def ftps_connect(s: Dict[str, Any], ctx: ssl.SSLContext):
     return ftp
 
 
-def _ftps_resolve_remote(s: Dict[str, Any], ctx: ssl.SSLContext, remote: str) -> Tuple[str, str, str, int]:
+def _ftps_close(ftp) -> None:
+    """Polite QUIT, falling back to a hard close."""
+    try:
+        ftp.quit()
+    except Exception:
+        try: ftp.close()
+        except Exception: pass
+
+
+def _abs_dir(ftp, rdir: str) -> str:
+    """rdir as an absolute path: "" or "/" is the login directory, relative paths are under it."""
+    if rdir in {"", "/"}:
+        return ftp._rt_home
+    if rdir.startswith("/"):
+        return rdir
+    return join_posix(ftp._rt_home, rdir)
+
+
+def _ftps_cwd(ftp, rdir: str) -> None:
     """
-    Try multiple candidate paths by progressively stripping leading components from the
-    relative portion under ftp_root until we find one that exists. Returns (canonical_remote, rdir, rname, size).
+    CWD for a possibly reused session: "" or "/" means the login directory (a fresh
+    session never left it), and the round trip is skipped when already in rdir.
     """
-    ftp = ftps_connect(s, ctx)
+    cur = getattr(ftp, "_rt_cwd", None)
+    rdir = _abs_dir(ftp, rdir)
+    if rdir == (ftp._rt_home if cur is None else cur):
+        return
+    ftp.cwd(rdir)
+    ftp._rt_cwd = rdir
+
+
+def _cmd_path(ftp, rdir: str, rname: str) -> str:
+    """
+    Path to name rdir/rname in a command without a CWD. Root-level names stay relative
+    to the login directory (what "/" means to _ftps_cwd), which is entered if needed.
+    """
+    if rdir in {"", "/"}:
+        _ftps_cwd(ftp, rdir)
+        return rname
+    return join_posix(_abs_dir(ftp, rdir), rname)
+
+
+# Idle logged-in control connections, keyed by (host, port, user)
+_IDLE: Dict[Tuple[str, int, str], List[ftplib.FTP_TLS]] = {}
+_IDLE_LOCK = threading.Lock()
+# Sessions idle for less than this are handed out without a NOOP round trip
+_NOOP_AFTER = 30.0
+
+# Parsed directory listings keyed by (host, port, rdir): (monotonic stamp, {name: size})
+_LISTING_CACHE: Dict[Tuple[str, int, str], Tuple[float, Dict[str, int]]] = {}
+_LISTING_LOCK = threading.Lock()
+_LISTING_TTL = 60.0
+
+
+def _max_transfers(s: Dict[str, Any]) -> int:
+    """Most data connections a run can have open at once."""
+    return (int(s.get("ftps_segments", 1)) * int(s.get("ftps_file_concurrency", 1))
+            * int(s.get("ftps_torrent_concurrency", 1)))
+
+
+class RemoteNotFound(FileNotFoundError):
+    """No remote candidate matched; every probe got a complete reply, so the session is reusable."""
+
+
+@contextlib.contextmanager
+def ftps_session(s: Dict[str, Any], ctx: ssl.SSLContext) -> Iterator[ftplib.FTP_TLS]:
+    """
+    Check out a logged-in FTPS connection, reusing an idle one when available.
+    The connection goes back to the idle list on clean exit (or RemoteNotFound) and is
+    dropped if the body raises anything else.
+    """
+    key = (s["ftps_host"], int(s.get("ftps_port", 21)), s["ftps_user"])
+    ftp = None
+    with _IDLE_LOCK:
+        idle = _IDLE.get(key)
+        if idle:
+            ftp = idle.pop()
+    if ftp is not None and time.monotonic() - ftp._rt_last_used > _NOOP_AFTER:
+        try:
+            ftp.voidcmd("NOOP")  # server may have timed out the idle session
+        except Exception:
+            _ftps_close(ftp)
+            ftp = None
+    if ftp is None:
+        ftp = ftps_connect(s, ctx)
     try:
-        ftp_root = posix_norm(s.get("ftp_root", "/"))
-        remote = posix_norm(remote)
-
-        # Derive relative path under ftp_root if possible
-        rel = remote
-        if remote.startswith(ftp_root.rstrip("/") + "/") or remote == ftp_root:
-            rel = remote[len(ftp_root):].lstrip("/")
-        else:
-            # fallback: treat remote as a relative path already
-            rel = remote.lstrip("/")
-
-        parts = [p for p in rel.split("/") if p]
-        tails = []
-        for i in range(len(parts)):
-            tails.append("/".join(parts[i:]))
-        if not tails:
-            tails = [rel]
-
-        last_err = None
-        for tail in tails:
-            cand = join_posix(ftp_root, tail)
-            rdir, rname = posixpath.split(cand)
+        yield ftp
+    except RemoteNotFound:
+        _ftps_release(s, key, ftp)
+        raise
+    except BaseException:
+        _ftps_close(ftp)
+        raise
+    _ftps_release(s, key, ftp)
+
+
+def _ftps_release(s: Dict[str, Any], key: Tuple[str, int, str], ftp) -> None:
+    """Return a session to the idle list, or QUIT it when the list is full."""
+    if ftp.sock is None:  # closed by the caller
+        return
+    # Enough idle connections for every segment of every concurrent file
+    cap = _max_transfers(s) + 2
+    ftp._rt_last_used = time.monotonic()
+    with _IDLE_LOCK:
+        idle = _IDLE.setdefault(key, [])
+        if len(idle) < cap:
+            idle.append(ftp)
+            return
+    _ftps_close(ftp)
+
+
+def ftps_close_all() -> None:
+    """QUIT every idle pooled connection (call once at the end of a run)."""
+    with _IDLE_LOCK:
+        conns = [ftp for idle in _IDLE.values() for ftp in idle]
+        _IDLE.clear()
+    for ftp in conns:
+        _ftps_close(ftp)
+
+
+def _mlst_size(ftp, name: str) -> int:
+    """Size of a single file from its MLST facts (RFC 3659); no data connection needed."""
+    resp = ftp.sendcmd(f"MLST {name}")
+    for line in resp.splitlines()[1:]:
+        if not line.startswith(" "):
+            continue
+        facts_str = line[1:].partition(" ")[0]
+        facts = {}
+        for fact in facts_str.split(";"):
+            k, sep, v = fact.partition("=")
+            if sep:
+                facts[k.lower()] = v
+        if facts.get("type", "").lower() != "file":
+            raise FileNotFoundError(f"{name} is not a file")
+        return int(facts.get("size", 0))
+    raise FileNotFoundError(f"{name}: no MLST facts in reply")
+
+
+def _probe_size(ftp, name: str) -> Optional[int]:
+    """
+    SIZE, telling "no such file" (550, raised as-is) from "command not supported"
+    (500/502), in which case MLST answers for just this entry. Servers without SIZE
+    are remembered per session.
+    """
+    if not getattr(ftp, "_rt_no_size", False):
+        try:
+            return ftp.size(name)
+        except ftplib.error_perm as e:
+            if not str(e).startswith(("500", "502")):
+                raise
+            ftp._rt_no_size = True
+            # Only the facts we parse; trims every later MLST/MLSD reply on this session
             try:
-                if rdir and rdir not in {"", "/"}:
-                    ftp.cwd(rdir)
-                try:
-                    rsize = ftp.size(rname)
-                except Exception:
-                    try:
-                        # Try MLSD first for structured listing with file sizes
-                        file_entries = {}
-                        try:
-                            for entry_name, entry_facts in ftp.mlsd():
-                                if entry_facts.get('type') == 'file':
-                                    file_size = int(entry_facts.get('size', 0))
-                                    file_entries[entry_name] = file_size
-                        except (ftplib.error_perm, AttributeError):
-                            # Fallback to NLST if MLSD not supported
-                            names = ftp.nlst()
-                            file_entries = {name: 0 for name in names}
-                        
-                        # Try exact match first
-                        if rname in file_entries:
-                            rsize = file_entries[rname]
-                        else:
-                            # Normalize the target filename for comparison
-                            rname_norm = _normalize_filename(rname)
-                            rname_lower = rname_norm.lower()
-                            found = False
-                            
-                            for n, n_size in file_entries.items():
-                                n_norm = _normalize_filename(n)
-                                n_lower = n_norm.lower()
-                                
-                                # Try normalized exact match
-                                if n_norm == rname_norm:
-                                    rname = n  # Use the actual filename from server
-                                    rsize = n_size
-                                    found = True
-                                    break
-                                # Try case-insensitive normalized match
-                                elif n_lower == rname_lower:
-                                    rname = n  # Use the actual filename from server
-                                    rsize = n_size
-                                    found = True
-                                    break
-                                # Try path-based matches with normalization
-                                elif n.endswith("/" + rname) or n_norm.endswith("/" + rname_norm):
-                                    rname = n.split("/")[-1]  # Extract filename
-                                    rsize = n_size
-                                    found = True
-                                    break
-                                elif n_lower.endswith("/" + rname_lower):
-                                    rname = n.split("/")[-1]  # Extract filename
-                                    rsize = n_size
-                                    found = True
-                                    break
-                            
-                            # If still not found, try partial matching for nested files
-                            if not found:
-                                for n, n_size in file_entries.items():
-                                    # Check if this is a directory that might contain our file
-                                    if "/" not in n and n != rname:
-                                        continue
-                                    n_norm = _normalize_filename(n)
-                                    n_lower = n_norm.lower()
-                                    # Check if the filename appears anywhere in the path with normalization
-                                    if (rname in n or rname_norm in n_norm or 
-                                        rname_lower in n_lower):
-                                        rname = n.split("/")[-1] if "/" in n else n
-                                        rsize = n_size
-                                        found = True
-                                        break
-                            if not found:
-                                raise FileNotFoundError(f"{rname} not in listing")
-                    except Exception as e:
-                        last_err = e
-                        continue
-                if rsize is None:
-                    rsize = 0
-                return (cand, rdir, rname, int(rsize))
-            except Exception as e:
-                last_err = e
-                continue
-        if last_err:
-            raise FileNotFoundError(f"No matching remote path for {remote}: {last_err}")
-        raise FileNotFoundError(f"No matching remote path for {remote}")
+                ftp.sendcmd("OPTS MLST type;size;")
+            except ftplib.Error:
+                pass
+    return _mlst_size(ftp, name)
+
+
+def _list_files(ftp) -> Dict[str, int]:
+    """File entries of the current directory as {name: size} (size 0 when unknown)."""
+    # Try MLSD first for structured listing with file sizes
+    file_entries = {}
+    try:
+        for entry_name, entry_facts in ftp.mlsd():
+            if entry_facts.get('type') == 'file':
+                file_size = int(entry_facts.get('size', 0))
+                file_entries[entry_name] = file_size
+    except (ftplib.error_perm, AttributeError):
+        # Fallback to NLST if MLSD not supported
+        names = ftp.nlst()
+        file_entries = {name: 0 for name in names}
     finally:
-        try:
-            ftp.quit()
-        except Exception:
-            try: ftp.close()
-            except Exception: pass
+        # Listings run in ASCII mode; restore binary for whoever reuses this session
+        ftp.voidcmd('TYPE I')
+    return file_entries
 
 
-def ftps_get(cfg: Dict[str, Any], remote: str, dst: str, size_hint: int, progress: Progress, task_id=None) -> None:
+def _cached_listing(ftp, key: Tuple[str, int, str], rdir: str, refresh: bool = False) -> Tuple[Dict[str, int], bool]:
+    """
+    Listing of rdir, reused for _LISTING_TTL seconds across files of the same torrent.
+    Returns (entries, from_cache).
+    """
+    now = time.monotonic()
+    if not refresh:
+        with _LISTING_LOCK:
+            hit = _LISTING_CACHE.get(key)
+        if hit and now - hit[0] < _LISTING_TTL:
+            return hit[1], True
+    _ftps_cwd(ftp, rdir)
+    entries = _list_files(ftp)
+    with _LISTING_LOCK:
+        _LISTING_CACHE[key] = (now, entries)
+    return entries, False
+
+
+def _match_in_listing(file_entries: Dict[str, int], rname: str) -> Tuple[str, int]:
+    """
+    Find rname in a directory listing, tolerating Unicode/mojibake and case
+    differences. Returns (server_name, size); raises FileNotFoundError.
+    """
+    # Try exact match first
+    if rname in file_entries:
+        return rname, file_entries[rname]
+
+    # Normalize the target filename for comparison
+    rname_norm = _normalize_filename(rname)
+    rname_lower = rname_norm.lower()
+
+    # Index the listing once: normalized name, lowercased name, and (for nested
+    # entries) lowercased last path component. First entry wins on collisions.
+    by_norm: Dict[str, Tuple[str, int]] = {}
+    by_lower: Dict[str, Tuple[str, int]] = {}
+    by_tail: Dict[str, Tuple[str, int]] = {}
+    nested: List[Tuple[str, int, str, str, str]] = []
+    for n, n_size in file_entries.items():
+        n_norm = _normalize_filename(n)
+        n_lower = n_norm.lower()
+        by_norm.setdefault(n_norm, (n, n_size))
+        by_lower.setdefault(n_lower, (n, n_size))
+        if "/" in n:
+            base = n.rsplit("/", 1)[1]
+            by_tail.setdefault(n_lower.rsplit("/", 1)[1], (base, n_size))
+            nested.append((n, n_size, base, n_norm, n_lower))
+
+    # Normalized exact match, then case-insensitive, then path-suffix match
+    hit = by_norm.get(rname_norm) or by_lower.get(rname_lower) or by_tail.get(rname_lower)
+    if hit:
+        return hit
+
+    # If still not found, try partial matching for nested files
+    for n, n_size, base, n_norm, n_lower in nested:
+        if rname in n or rname_norm in n_norm or rname_lower in n_lower:
+            return base, n_size
+    raise FileNotFoundError(f"{rname} not in listing")
+
+
+# Failures that leave the control connection in sync: the server answered 4xx/5xx,
+# or the reply parsed but named nothing usable. Anything else (socket errors,
+# unexpected replies) propagates so the session is discarded.
+_MISS_ERRORS = (ftplib.error_perm, ftplib.error_temp, FileNotFoundError, ValueError)
+
+
+def _ftps_resolve_remote(ftp, s: Dict[str, Any], remote: str) -> Tuple[str, str, str, int]:
+    """
+    Try multiple candidate paths by progressively stripping leading components from the
+    relative portion under ftp_root until we find one that exists. Returns (canonical_remote, rdir, rname, size).
+    Every candidate is first probed for its exact name; directory listings (one data
+    connection each) are only fetched once no exact match exists anywhere.
+    Runs on the caller's session; a miss raises RemoteNotFound, which leaves it pooled.
+    """
+    ftp_root = posix_norm(s.get("ftp_root", "/"))
+    remote = posix_norm(remote)
+
+    # Derive relative path under ftp_root if possible
+    rel = remote
+    if remote.startswith(ftp_root.rstrip("/") + "/") or remote == ftp_root:
+        rel = remote[len(ftp_root):].lstrip("/")
+    else:
+        # fallback: treat remote as a relative path already
+        rel = remote.lstrip("/")
+
+    parts = [p for p in rel.split("/") if p]
+    tails = []
+    for i in range(len(parts)):
+        tails.append("/".join(parts[i:]))
+    if not tails:
+        tails = [rel]
+
+    cands = [join_posix(ftp_root, tail) for tail in tails]
+
+    # Pass 1: exact names via SIZE on absolute paths -- no CWD, no listings
+    last_err = None
+    for cand in cands:
+        rdir, rname = posixpath.split(cand)
+        try:
+            rsize = _probe_size(ftp, _cmd_path(ftp, rdir, rname))
+        except _MISS_ERRORS as e:
+            last_err = e
+            continue
+        return (cand, rdir, rname, int(rsize or 0))
+
+    # Pass 2: fuzzy match against the listing of each candidate directory that exists
+    # (a missing directory fails its CWD with 550 and is skipped)
+    for cand in cands:
+        rdir, rname = posixpath.split(cand)
+        key = (s["ftps_host"], int(s.get("ftps_port", 21)), _abs_dir(ftp, rdir))
+        try:
+            entries, cached = _cached_listing(ftp, key, rdir)
+            try:
+                rname, rsize = _match_in_listing(entries, rname)
+            except FileNotFoundError:
+                if not cached:
+                    raise
+                # The directory may have changed since it was listed
+                entries, _ = _cached_listing(ftp, key, rdir, refresh=True)
+                rname, rsize = _match_in_listing(entries, rname)
+        except _MISS_ERRORS as e:
+            last_err = e
+            continue
+        return (join_posix(rdir, rname), rdir, rname, int(rsize or 0))
+
+    if last_err:
+        raise RemoteNotFound(f"No matching remote path for {remote}: {last_err}")
+    raise RemoteNotFound(f"No matching remote path for {remote}")
+
+
+_SEG_POOL: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_SEG_POOL_SIZE = 0
+_SEG_POOL_LOCK = threading.Lock()
+# Set by ftps_abort(); transfers check it between blocks
+_ABORT = threading.Event()
+
+
+def _segment_pool(workers: int) -> concurrent.futures.ThreadPoolExecutor:
+    """Shared executor for segment workers, so threads outlive a single file."""
+    global _SEG_POOL, _SEG_POOL_SIZE
+    with _SEG_POOL_LOCK:
+        if _SEG_POOL is None or _SEG_POOL_SIZE < workers:
+            if _SEG_POOL is not None:
+                _SEG_POOL.shutdown(wait=False)  # queued segments still run
+            _SEG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ftps-seg")
+            _SEG_POOL_SIZE = workers
+        return _SEG_POOL
+
+
+def ftps_abort() -> None:
+    """
+    Stop the run's transfers (Ctrl-C): running ones end after their current block and
+    queued segments are dropped. Pool threads aren't daemons, so without this the
+    interpreter would wait for every started download before exiting.
+    """
+    _ABORT.set()
+    with _SEG_POOL_LOCK:
+        if _SEG_POOL is not None:
+            _SEG_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+class _ProgressBatch:
+    """Coalesce progress advances into one update per interval or per `step` bytes."""
+
+    INTERVAL = 0.25  # seconds; matches the 4 Hz refresh of the progress display in main
+
+    def __init__(self, progress: Progress, task_id, step: int) -> None:
+        self.progress = progress
+        self.task_id = task_id
+        self.step = step
+        self.pending = 0
+        self.last = time.monotonic()
+
+    def advance(self, n: int) -> None:
+        if self.task_id is None:
+            return
+        self.pending += n
+        now = time.monotonic()
+        if self.pending >= self.step or now - self.last >= self.INTERVAL:
+            self.progress.update(self.task_id, advance=self.pending)
+            self.pending = 0
+            self.last = now
+
+    def flush(self) -> None:
+        if self.task_id is not None and self.pending:
+            self.progress.update(self.task_id, advance=self.pending)
+            self.pending = 0
+
+
+def ftps_is_segmented(s: Dict[str, Any], size: int) -> bool:
+    """Whether a file of this size is fetched over several connections (else one)."""
+    segments = int(s.get("ftps_segments", 1))
+    blocksize = int(s.get("ftps_blocksize", 1024 * 1024))
+    min_seg = int(s.get("ftps_min_seg_size", 8 * 1024 * 1024))
+    return size > 0 and segments > 1 and size >= max(min_seg, segments * blocksize)
+
+
+def ftps_get(cfg: Dict[str, Any], remote: str, dst: str, size_hint: int, progress: Progress, task_id=None,
+             console: Optional[Console] = None) -> None:
     """
     FTPS download with optional multi-connection segmentation using REST + transfercmd.
     If the destination exists with same size, SKIP download (but caller still relabels).
+    Verbose messages go to `console` (the caller's, so they land above its progress display).
     """
     s = cfg["sftp"]
+    if console is None:
+        console = _CONSOLE
     ensure_dir(os.path.dirname(dst))
     remote = posix_norm(remote)
 
-    # TLS context for resolution/probe
-    ctx_probe = ssl.create_default_context()
-    if not s.get("ftps_tls_verify", True):
-        ctx_probe.check_hostname = False
-        ctx_probe.verify_mode = ssl.CERT_NONE
+    # Shared TLS context for resolution, probe and transfers
+    ctx = _get_ssl_ctx(bool(s.get("ftps_tls_verify", True)))
 
-    # Resolve canonical path & probed size
-    canonical_remote, rdir, rname, probed_size = _ftps_resolve_remote(s, ctx_probe, remote)
-    remote = canonical_remote
+    # One session resolves, probes and (single-stream) transfers; for segmented files it
+    # goes back to the pool before the workers start, so the first worker picks it up.
+    with ftps_session(s, ctx) as ftps:
+        # Resolve canonical path & probed size
+        remote, rdir, rname, probed_size = _ftps_resolve_remote(ftps, s, remote)
 
-    # Fast skip if same-size destination exists
-    if os.path.exists(dst):
-        try:
-            if probed_size > 0 and os.path.getsize(dst) == probed_size:
-                vprint(Console(), f"[FTPS] skip (exists same size): {dst}")
+        # Fast skip if same-size destination exists
+        st = _stat_or_none(dst)
+        if st is not None:
+            if probed_size > 0 and st.st_size == probed_size:
+                vprint(console, f"[FTPS] skip (exists same size): {dst}")
                 progress.update(task_id, completed=probed_size) if task_id is not None else None
                 return
-            if size_hint > 0 and os.path.getsize(dst) == size_hint:
-                vprint(Console(), f"[FTPS] skip (exists same size, hint): {dst}")
+            if size_hint > 0 and st.st_size == size_hint:
+                vprint(console, f"[FTPS] skip (exists same size, hint): {dst}")
                 progress.update(task_id, completed=size_hint) if task_id is not None else None
                 return
-        except Exception:
-            pass
-
-    # TLS context for transfers
-    ctx = ssl.create_default_context()
-    if not s.get("ftps_tls_verify", True):
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
 
-    blocksize = int(s.get("ftps_blocksize", 262144))
-    segments  = int(s.get("ftps_segments", 1))
-    min_seg   = int(s.get("ftps_min_seg_size", 8 * 1024 * 1024))
+        blocksize = int(s.get("ftps_blocksize", 1024 * 1024))
+        segments  = int(s.get("ftps_segments", 1))
+        min_seg   = int(s.get("ftps_min_seg_size", 8 * 1024 * 1024))
 
-    # Determine size for segmentation decision
-    rsize = probed_size if probed_size > 0 else size_hint
-    if rsize <= 0:
-        ftps0 = ftps_connect(s, ctx)
-        try:
-            if rdir and rdir not in {"", "/"}:
-                ftps0.cwd(rdir)
+        # Determine size for segmentation decision
+        rsize = probed_size if probed_size > 0 else size_hint
+        if rsize <= 0:
             try:
-                rsize = ftps0.size(rname) or 0
-            except Exception:
+                rsize = ftps.size(_cmd_path(ftps, rdir, rname)) or 0
+            except _MISS_ERRORS:
                 rsize = 0
-        finally:
-            try:
-                ftps0.quit()
-            except Exception:
-                try: ftps0.close()
-                except Exception: pass
 
-    # Single-stream path
-    if rsize <= 0 or segments <= 1 or rsize < max(min_seg, segments * blocksize):
-        ftps = ftps_connect(s, ctx)
-        try:
-            if rdir and rdir not in {"", "/"}:
-                ftps.cwd(rdir)
-            done = 0
+        # Large files: grow the block (never shrink it) to cut write syscalls further
+        if rsize > _BIG_FILE:
+            blocksize = max(blocksize, min(_MAX_BLOCKSIZE, rsize // 64))
+        # Each recv on a TLS socket yields at most one record; avoid a short tail read per block
+        blocksize = -(-blocksize // _TLS_RECORD) * _TLS_RECORD
+
+        # Single-stream path
+        if not ftps_is_segmented(s, rsize):
+            _ftps_cwd(ftps, rdir)
             tmp = dst + ".part"
             try:
                 if os.path.exists(tmp):
                     os.remove(tmp)
             except Exception:
                 pass
-            with open(tmp, "wb") as wf:
-                def _cb(chunk: bytes):
-                    nonlocal done
-                    wf.write(chunk)
-                    done += len(chunk)
-                    total = rsize if rsize > 0 else done
-                    progress.update(task_id, completed=min(done, total)) if task_id is not None else None
-                ftps.retrbinary(f"RETR {rname}", _cb, blocksize=blocksize)
-            os.replace(tmp, dst)  # atomic replace on success
-        finally:
+            # Drive the data socket directly: recv_into one reused buffer
+            # instead of a fresh bytes object + callback per block (retrbinary).
+            # Unbuffered fd: blocks go straight from the buffer to the kernel, same as segments
+            # (a file object where os.pwrite is unavailable).
+            view = memoryview(bytearray(blocksize))
+            batch = _ProgressBatch(progress, task_id, max(rsize // 1000, blocksize))
+            wf = None
+            if _HAS_PWRITE:
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            else:
+                wf = open(tmp, "wb")
             try:
-                ftps.quit()
-            except Exception:
-                try: ftps.close()
-                except Exception: pass
-        return
+                with ftps.transfercmd(f"RETR {rname}") as datasock:
+                    pos = 0
+                    while not _ABORT.is_set():
+                        n = _recv_fill(datasock, view)
+                        if not n:
+                            break
+                        if wf is None:
+                            _pwrite_all(fd, view[:n], pos)
+                        else:
+                            wf.write(view[:n])
+                        pos += n
+                        batch.advance(n)
+                        if n < len(view):
+                            break
+                    batch.flush()
+                    if isinstance(datasock, ssl.SSLSocket) and not _ABORT.is_set():
+                        datasock.unwrap()
+            finally:
+                if wf is None:
+                    os.close(fd)
+                else:
+                    wf.close()
+            if _ABORT.is_set():
+                # 426 for the connection we hung up on; keeps the session in sync
+                try: ftps.voidresp()
+                except ftplib.Error: pass
+                raise RuntimeError(f"FTPS download aborted: {remote}")
+            ftps.voidresp()
+            os.replace(tmp, dst)  # atomic replace on success
+            return
 
     # Segmented path
     tmp = dst + ".part"
@@ -354,15 +784,25 @@ def ftps_get(cfg: Dict[str, Any], remote: str, dst: str, size_hint: int, progres
             os.remove(tmp)
     except Exception:
         pass
-    with open(tmp, "wb") as f:
-        f.truncate(rsize)
-    f = open(tmp, "r+b")
-    mm = mmap.mmap(f.fileno(), rsize, access=mmap.ACCESS_WRITE)
+    # Workers pwrite() their segments straight to this fd at absolute offsets
+    # (or, without os.pwrite, through a handle of their own)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    _preallocate(fd, rsize)
 
     ranges: List[Tuple[int,int]] = []
     seg_size = rsize // segments
+
+    # Optional O_DIRECT: bypass the page cache for the bulk of each segment.
+    # Segment starts are aligned so every full block lands on an aligned offset.
+    dfd = None
+    if s.get("ftps_direct_io", False) and seg_size >= _DIRECT_ALIGN:
+        seg_size -= seg_size % _DIRECT_ALIGN
+        dfd = _open_direct(tmp)
+        if dfd is None:
+            vprint(console, f"[FTPS] O_DIRECT unavailable for {tmp}, using buffered writes")
     
-    progress.update(task_id, total=rsize)
+    if task_id is not None:
+        progress.update(task_id, total=rsize)
 
     for i in range(segments):
         start_off = i * seg_size
@@ -373,43 +813,93 @@ def ftps_get(cfg: Dict[str, Any], remote: str, dst: str, size_hint: int, progres
 
     def worker(start_off: int, end_off: int):
         try:
-            ftp = ftps_connect(s, ctx)
-            try:
-                if rdir and rdir not in {"", "/"}:
-                    ftp.cwd(rdir)
+            with ftps_session(s, ctx) as ftp:
+                _ftps_cwd(ftp, rdir)
                 datasock = ftp.transfercmd(f"RETR {rname}", rest=start_off)
                 remaining = end_off - start_off
                 pos = start_off
-                while remaining > 0:
-                    chunk = datasock.recv(min(blocksize, remaining))
-                    if not chunk:
-                        break
-                    mm[pos:pos+len(chunk)] = chunk
-                    pos += len(chunk)
-                    remaining -= len(chunk)
-                    progress.update(task_id, advance=len(chunk)) if task_id is not None else None
+                if dfd is not None:
+                    # Page-aligned block so full blocks can go out with O_DIRECT
+                    bufsize = -(-blocksize // _DIRECT_ALIGN) * _DIRECT_ALIGN
+                    buf = mmap.mmap(-1, bufsize)
+                else:
+                    bufsize = blocksize
+                    buf = bytearray(blocksize)
+                view = memoryview(buf)
+                batch = _ProgressBatch(progress, task_id, max(rsize // 1000, bufsize))
+                wf = None
+                if not _HAS_PWRITE:
+                    wf = open(tmp, "r+b")
+                    wf.seek(start_off)
+                try:
+                    while remaining > 0 and not _ABORT.is_set():
+                        want = min(bufsize, remaining)
+                        n = _recv_fill(datasock, view[:want])
+                        if not n:
+                            break
+                        if dfd is not None:
+                            _pwrite_direct(dfd, fd, view[:n], pos)
+                        elif wf is None:
+                            _pwrite_all(fd, view[:n], pos)
+                        else:
+                            wf.write(view[:n])
+                        pos += n
+                        remaining -= n
+                        batch.advance(n)
+                        if n < want:
+                            break
+                finally:
+                    if wf is not None:
+                        wf.close()
+                    batch.flush()
+                    view.release()
+                    if dfd is not None:
+                        try:
+                            buf.close()
+                        except BufferError:
+                            # A slice is still referenced from the traceback of the error
+                            # being raised; the map is freed with it, don't mask that error
+                            pass
                 try:
                     datasock.close()
                 finally:
+                    # 226, or 426 when we hung up before the end of the file;
+                    # either way the reply is consumed and the connection reusable
                     try: ftp.voidresp()
-                    except Exception: pass
-            finally:
-                try: ftp.quit()
-                except Exception:
-                    try: ftp.close()
-                    except Exception: pass
-            if remaining != 0:
+                    except ftplib.Error: pass
+                    except Exception: _ftps_close(ftp)
+            if _ABORT.is_set():
+                errors.append(RuntimeError(f"Aborted segment {start_off}-{end_off}"))
+            elif remaining != 0:
                 errors.append(RuntimeError(f"Short read segment {start_off}-{end_off}, remaining={remaining}"))
         except Exception as e:
             errors.append(e)
 
-    threads = [threading.Thread(target=worker, args=rng, daemon=True) for rng in ranges]
-    for t in threads: t.start()
-    for t in threads: t.join()
-
-    mm.flush()
-    mm.close()
-    f.close()
+    try:
+        futs = []
+        try:
+            pool = _segment_pool(_max_transfers(s))
+            for a, b in ranges:
+                futs.append(pool.submit(worker, a, b))
+        except RuntimeError as e:  # pool already shut down by ftps_abort()
+            errors.append(e)
+        # result(), not wait(): segments cancelled by ftps_abort() never wake wait()
+        for fut in futs:
+            try:
+                fut.result()
+            except concurrent.futures.CancelledError:
+                errors.append(RuntimeError("Segment cancelled"))
+        if _ABORT.is_set() and not errors:
+            errors.append(RuntimeError("Aborted"))  # never publish a partial .part
+        if not errors:
+            os.fsync(fd)  # data on disk before the rename makes it visible
+            # Clean pages now; drop them so a large download doesn't evict the rest of the cache
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, rsize, os.POSIX_FADV_DONTNEED)
+    finally:
+        if dfd is not None:
+            os.close(dfd)
+        os.close(fd)
 
     if errors:
         raise RuntimeError(f"FTPS segmented download failed: {errors[0]}")
@@ -4,23 +4,53 @@
 import argparse
 import concurrent.futures
 import os
-from typing import Any, Dict, Tuple
+import threading
+from typing import Any, Dict, List, Tuple
 
 from rich.console import Console
-from rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn, TransferSpeedColumn, SpinnerColumn
+from rich.progress import BarColumn, Progress, TaskID, TextColumn, TimeRemainingColumn, TransferSpeedColumn, SpinnerColumn
 
 try:
     from .config import load_config
-    from .ftps_client import ftps_get, ftps_plan_from_files
-    from .rutorrent_client import connect_rutorrent, is_completed, list_by_label, relabel
+    from .ftps_client import ftps_abort, ftps_close_all, ftps_get, ftps_is_segmented, ftps_plan_from_files
+    from .rutorrent_client import connect_rutorrent, is_completed, list_by_labels, relabel
     from .secrets import maybe_load_dotenv, resolve_secret
-    from .utils import DRY_RUN, ensure_dir, set_flags, vprint
+    from . import utils
+    from .utils import ensure_dir, set_flags, vprint
 except ImportError:
     from config import load_config
-    from ftps_client import ftps_get, ftps_plan_from_files
-    from rutorrent_client import connect_rutorrent, is_completed, list_by_label, relabel
+    from ftps_client import ftps_abort, ftps_close_all, ftps_get, ftps_is_segmented, ftps_plan_from_files
+    from rutorrent_client import connect_rutorrent, is_completed, list_by_labels, relabel
     from secrets import maybe_load_dotenv, resolve_secret
-    from utils import DRY_RUN, ensure_dir, set_flags, vprint
+    import utils
+    from utils import ensure_dir, set_flags, vprint
+
+
+# Files below this size are tracked on one aggregate progress row per torrent
+_SMALL_FILE = 1024 * 1024
+
+# Executors for per-file transfers, keyed by worker count and shared by every torrent
+_FILE_POOLS: Dict[int, concurrent.futures.ThreadPoolExecutor] = {}
+_FILE_POOLS_LOCK = threading.Lock()
+
+
+def _file_pool(workers: int) -> concurrent.futures.ThreadPoolExecutor:
+    """Return the shared executor with `workers` threads, creating it on first use."""
+    with _FILE_POOLS_LOCK:
+        pool = _FILE_POOLS.get(workers)
+        if pool is None:
+            pool = _FILE_POOLS[workers] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="ftps-file")
+        return pool
+
+
+def _shutdown_file_pools(cancel: bool = False) -> None:
+    """Shut the file executors down; with cancel, drop queued files and don't wait."""
+    with _FILE_POOLS_LOCK:
+        pools = list(_FILE_POOLS.values())
+        _FILE_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=not cancel, cancel_futures=cancel)
 
 
 def process_torrent(cfg: Dict[str, Any], rt, t: Dict[str, Any], mapping: Dict[str, Any], console: Console, progress: Progress) -> None:
@@ -48,6 +78,14 @@ def process_torrent(cfg: Dict[str, Any], rt, t: Dict[str, Any], mapping: Dict[st
         console.print(f"[yellow][WARN][/yellow] {name}: nothing to transfer (ftps plan empty)")
         return
 
+    # Read the flag at call time: set_flags() runs after this module is imported
+    if utils.DRY_RUN:
+        console.print(f"[green][DRY][/green] {name}: {len(plan)} files -> {dest_root} [ftps]")
+        for remote, rel, size in plan:
+            vprint(console, f"[FTPS] {remote} -> {os.path.normpath(os.path.join(dest_root, rel))} ({size} bytes)")
+        console.print(f"[magenta][DRY][/magenta] {name}: would relabel {mapping['source']} -> {dst_label}")
+        return
+
     ensure_dir(dest_root)
     console.print(f"[green][PROC][/green] {name}: {len(plan)} files -> {dest_root} [ftps]")
     vprint(console, f"Plan sample: {plan[:3]}")
@@ -55,39 +93,98 @@ def process_torrent(cfg: Dict[str, Any], rt, t: Dict[str, Any], mapping: Dict[st
     # Optional per-file concurrency
     file_workers = int(s.get("ftps_file_concurrency", 1))
 
-    def _one(item: Tuple[str,str,int]) -> None:
-        remote, rel, size = item
-        dst = os.path.normpath(os.path.join(dest_root, rel))
-        if DRY_RUN:
-            vprint(console, f"[FTPS] {remote} -> {dst} ({size} bytes)")
-            return
+    # Resolve every destination once and create its directories up front (parents first)
+    jobs = [(remote, rel, size, os.path.normpath(os.path.join(dest_root, rel))) for remote, rel, size in plan]
+    # Sizes of destinations that already exist, from one directory read per folder
+    local_sizes: Dict[str, int] = {}
+    wanted = {job[3] for job in jobs}
+    for d in sorted({os.path.dirname(dst) for dst in wanted}, key=len):
+        ensure_dir(d)
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.path in wanted and e.is_file():
+                        local_sizes[e.path] = e.stat().st_size
+        except OSError:
+            for dst in wanted:
+                if os.path.dirname(dst) == d and os.path.isfile(dst):
+                    local_sizes[dst] = os.path.getsize(dst)
+
+    # Progress rows are hidden and reused between files rather than added/removed per file
+    free_rows: List[TaskID] = []
+    all_rows: List[TaskID] = []
+    rows_lock = threading.Lock()
+
+    # Small files still to fetch share one aggregate row instead of a bar each
+    small_dsts = {dst for _, _, size, dst in jobs if 0 < size < _SMALL_FILE and dst not in local_sizes}
+    small_row = None
+    small_done = [0]
+    if len(small_dsts) > 1:
+        small_total = sum(size for _, _, size, dst in jobs if dst in small_dsts)
+        small_row = progress.add_task(f"[white]\\[small files] 0/{len(small_dsts)}", total=small_total)
+        all_rows.append(small_row)
+
+    def _one(item: Tuple[str,str,int,str]) -> None:
+        remote, rel, size, dst = item
 
         # If file exists already:
-        if os.path.exists(dst):
+        lsize = local_sizes.get(dst)
+        if lsize is not None:
             # If we know the size and it matches, skip without progress bar
-            try:
-                if size > 0 and os.path.getsize(dst) == size:
-                    vprint(console, f"[FTPS] exists same size -> skip (no bar): {dst}")
-                    return
-            except Exception:
-                pass
+            if size > 0 and lsize == size:
+                vprint(console, f"[FTPS] exists same size -> skip (no bar): {dst}")
+                return
             # Unknown size: let ftps_get probe & skip without creating a bar
-            ftps_get(cfg, remote, dst, size, progress, task_id=None)
+            ftps_get(cfg, remote, dst, size, progress, task_id=None, console=console)
+            return
+
+        if small_row is not None and dst in small_dsts:
+            ftps_get(cfg, remote, dst, size, progress, task_id=None, console=console)
+            with rows_lock:
+                small_done[0] += 1
+                desc = f"[white]\\[small files] {small_done[0]}/{len(small_dsts)}"
+            progress.update(small_row, advance=size, description=desc)
             return
 
-        # Not existing: create a bar and download
-        task = progress.add_task(f"[white]{rel}", total=size if size > 0 else None)
+        # Not existing: take a bar (a recycled one when free) and download.
+        # reset() can't clear a row's total, so unknown sizes always get a fresh row.
+        total = size if size > 0 else None
+        with rows_lock:
+            task = free_rows.pop() if free_rows and total is not None else None
+        if task is None:
+            task = progress.add_task(f"[white]{rel}", total=total)
+            with rows_lock:
+                all_rows.append(task)
+        else:
+            progress.reset(task, total=total, description=f"[white]{rel}", visible=True)
         try:
-            ftps_get(cfg, remote, dst, size, progress, task)
+            ftps_get(cfg, remote, dst, size, progress, task, console=console)
         finally:
-            progress.remove_task(task)
+            progress.update(task, visible=False)
+            with rows_lock:
+                free_rows.append(task)
+
+    # Files too small to be segmented hold one connection each, so they may run
+    # ftps_segments-wide: never more connections than one segmented file uses.
+    # Unknown sizes (0) are treated as large.
+    # Biggest first within each group, so a large file doesn't end up running alone at the end
+    jobs.sort(key=lambda item: item[2], reverse=True)
+    small = [item for item in jobs if item[2] > 0 and not ftps_is_segmented(s, item[2])]
+    large = [item for item in jobs if item[2] <= 0 or ftps_is_segmented(s, item[2])]
+    small_workers = file_workers * max(1, int(s.get("ftps_segments", 1)))
+    # Pools are shared by concurrently processed torrents, each entitled to its own share
+    torrent_workers = int(s.get("ftps_torrent_concurrency", 1))
 
-    if file_workers > 1 and len(plan) > 1:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=file_workers) as ex:
-            list(ex.map(_one, plan))
-    else:
-        for item in plan:
-            _one(item)
+    try:
+        for items, workers in ((small, small_workers), (large, file_workers)):
+            if workers > 1 and len(items) > 1:
+                list(_file_pool(workers * torrent_workers).map(_one, items))
+            else:
+                for item in items:
+                    _one(item)
+    finally:
+        for task in all_rows:
+            progress.remove_task(task)
 
     # Relabel after transfers (always attempt, even if downloads were skipped)
     try:
@@ -103,7 +200,12 @@ def main() -> None:
     parser.add_argument("--config", required=True, help="Path to JSON config")
     parser.add_argument("--verbose", action="store_true", help="Verbose logging")
     parser.add_argument("--dry-run", action="store_true", help="Only print planned actions, do not transfer")
+    parser.add_argument("--torrent-concurrency", type=int, default=None,
+                        help="Torrents processed in parallel (overrides sftp.ftps_torrent_concurrency)")
     args = parser.parse_args()
+    # Same bound load_config enforces for the config key this overrides
+    if args.torrent_concurrency is not None and not 1 <= args.torrent_concurrency <= 8:
+        parser.error("--torrent-concurrency must be an integer between 1 and 8")
 
     # Set global flags
     set_flags(verbose=bool(args.verbose), dry_run=bool(args.dry_run))
@@ -121,37 +223,68 @@ def main() -> None:
     s = cfg.get("sftp", {})
     s["ftps_user"] = resolve_secret(s.get("ftps_user"), cfg, console=console) or s.get("ftps_user")
     s["ftps_password"] = resolve_secret(s.get("ftps_password"), cfg, username=s.get("ftps_user"), console=console) or s.get("ftps_password")
+    if args.torrent_concurrency is not None:
+        s["ftps_torrent_concurrency"] = args.torrent_concurrency
     # Reassign (in case dict was a shallow copy)
     cfg["sftp"] = s
 
     rt = connect_rutorrent(cfg["rutorrent"]["uri"])
 
-    # Process all label mappings
+    # Gather the work for all label mappings before the progress display starts;
+    # one torrent list fetch (with files) serves every mapping
+    by_label = list_by_labels(rt, [m["source"] for m in cfg["label_mappings"]])
     all_torrents_found = False
+    work = []
+    for mapping in cfg["label_mappings"]:
+        source_label = mapping["source"]
+        torrents = by_label[source_label]
+
+        if not torrents:
+            console.print(f"[yellow]No torrents with label '{source_label}'.[/yellow]")
+            continue
+
+        all_torrents_found = True
+        console.print(f"[blue]Processing {len(torrents)} torrents with label '{source_label}'[/blue]")
+        work.extend((mapping, t) for t in torrents)
     
-    with Progress(
-        TextColumn("[bold blue]{task.description}"),
-        BarColumn(),
-        TransferSpeedColumn(),
-        TextColumn("{task.completed}/{task.total}"),
-        TimeRemainingColumn(elapsed_when_finished=True),
-        console=console,
-        transient=False,
-    ) as progress:
-        for mapping in cfg["label_mappings"]:
-            source_label = mapping["source"]
-            torrents = list_by_label(rt, source_label)
-            
-            if not torrents:
-                console.print(f"[yellow]No torrents with label '{source_label}'.[/yellow]")
-                continue
-                
-            all_torrents_found = True
-            console.print(f"[blue]Processing {len(torrents)} torrents with label '{source_label}'[/blue]")
-            
-            for t in torrents:
-                process_torrent(cfg, rt, t, mapping, console, progress)
-    
+    try:
+        with Progress(
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TransferSpeedColumn(),
+            TextColumn("{task.completed}/{task.total}"),
+            TimeRemainingColumn(elapsed_when_finished=True),
+            console=console,
+            transient=False,
+            refresh_per_second=4,  # inline redraws; bars advance smoothly enough at 4 Hz
+            # Rows are removed as torrents finish, so off a terminal (cron, pipes) nothing
+            # would ever be shown: skip the refresh thread and rendering entirely
+            disable=not console.is_terminal,
+        ) as progress:
+            # Transfers are network-bound; independent torrents may overlap
+            torrent_workers = int(s.get("ftps_torrent_concurrency", 1))
+            if torrent_workers > 1 and len(work) > 1:
+                ex = concurrent.futures.ThreadPoolExecutor(max_workers=torrent_workers)
+                try:
+                    futs = [ex.submit(process_torrent, cfg, rt, t, mapping, console, progress) for mapping, t in work]
+                    for fut in concurrent.futures.as_completed(futs):
+                        fut.result()
+                finally:
+                    # Not a `with`: its exit would wait for every torrent before the abort below
+                    ex.shutdown(wait=False, cancel_futures=True)
+            else:
+                for mapping, t in work:
+                    process_torrent(cfg, rt, t, mapping, console, progress)
+    except BaseException:
+        # Ctrl-C or a failed torrent: stop transfers between blocks rather than letting
+        # started and queued downloads run to completion
+        ftps_abort()
+        _shutdown_file_pools(cancel=True)
+        raise
+    finally:
+        _shutdown_file_pools()
+        ftps_close_all()
+
     if not all_torrents_found:
         console.print("[yellow]No torrents found for any configured labels.[/yellow]")
 
@@ -47,7 +47,7 @@ Required config (supports JSON with comments)
     "ftp_root": "/export",
     "rtorrent_root": "/data/rtorrent",
 
-    "ftps_blocksize": 262144,
+    "ftps_blocksize": 1048576,
     "ftps_segments": 4,
     "ftps_min_seg_size": 8388608,
     "ftps_file_concurrency": 1
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """ruTorrent client functionality for rt_autodl."""
 
+import threading
 from functools import wraps
 from typing import Any, Dict, List
 
@@ -22,20 +23,34 @@ def connect_rutorrent(uri: str):
     return rTorrent(uri=uri)
 
 
+_COMPLETED_KEYS = ("completed_bytes", "completedBytes", "bytes_done")
+_TOTAL_KEYS = ("size_bytes", "sizeBytes", "size", "bytes_total")
+_SEED_STATES = frozenset(("seed", "seeding"))
+
+
+def _first_set(t: Dict[str, Any], keys) -> Any:
+    """First truthy value among keys (None if none)."""
+    for k in keys:
+        v = t.get(k)
+        if v:
+            return v
+    return None
+
+
 def is_completed(t: Dict[str, Any]) -> bool:
     """Check if torrent is completed."""
     p = t.get("progress")
-    if isinstance(p, (int, float)) and float(p) >= 100.0:
+    if isinstance(p, (int, float)) and p >= 100:
         return True
     if t.get("is_complete") == 1:
         return True
-    completed = t.get("completed_bytes") or t.get("completedBytes") or t.get("bytes_done")
-    total     = t.get("size_bytes") or t.get("sizeBytes") or t.get("size") or t.get("bytes_total")
-    if isinstance(completed, int) and isinstance(total, int) and total > 0:
-        return completed >= total
-    if str(t.get("connection_current", "")).lower() in {"seed", "seeding"}:
-        return True
-    return False
+    completed = _first_set(t, _COMPLETED_KEYS)
+    if isinstance(completed, int):
+        total = _first_set(t, _TOTAL_KEYS)
+        if isinstance(total, int) and total > 0:
+            return completed >= total
+    state = t.get("connection_current")
+    return bool(state) and str(state).lower() in _SEED_STATES
 
 
 def list_by_label(rt, label: str) -> List[Dict[str, Any]]:
@@ -44,6 +59,34 @@ def list_by_label(rt, label: str) -> List[Dict[str, Any]]:
     return [x for x in torrents if x.get("label") == label]
 
 
+def list_by_labels(rt, labels: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Get torrents for several labels from a single torrent list fetch."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {label: [] for label in labels}
+    for x in rt.get_torrents(include_files=True):
+        bucket = grouped.get(x.get("label"))
+        if bucket is not None:
+            bucket.append(x)
+    return grouped
+
+
+_HTTP = None  # requests.Session shared by relabel calls: keep-alive to the ruTorrent endpoint
+_HTTP_LOCK = threading.Lock()
+_PAYLOAD_SHAPE: Dict[str, int] = {}  # uri -> index of the setlabel payload variant that worked
+
+
+def _http_session():
+    """Lazily create the shared requests.Session."""
+    global _HTTP
+    with _HTTP_LOCK:
+        if _HTTP is None:
+            try:
+                import requests  # type: ignore
+            except Exception as e:
+                raise RuntimeError("requests is required for relabel fallback: pip install requests") from e
+            _HTTP = requests.Session()
+        return _HTTP
+
+
 def relabel(rt, info_hash: str, new_label: str, cfg: Dict[str, Any], console: Console) -> None:
     """
     Robust relabel:
@@ -53,22 +96,24 @@ def relabel(rt, info_hash: str, new_label: str, cfg: Dict[str, Any], console: Co
     uri = str(cfg.get("rutorrent", {}).get("uri", ""))
     if not uri:
         raise RuntimeError("No ruTorrent URI provided for HTTP fallback")
-    try:
-        import requests  # type: ignore
-    except Exception as e:
-        raise RuntimeError("requests is required for relabel fallback: pip install requests") from e
+    http = _http_session()
 
     payloads = [
         {"mode": "setlabel", "hash": info_hash, "v": new_label, "s": "label"},   # matches UI: v=<label>, s=label
         {"mode": "setlabel", "hash": info_hash, "v": new_label},                 # value only
         {"mode": "setlabel", "hash": info_hash, "label": new_label},             # alternate key
     ]
+    # Try the variant this server accepted last time first
+    known = _PAYLOAD_SHAPE.get(uri, 0)
+    order = [known] + [i for i in range(len(payloads)) if i != known]
     last_exc = None
-    for data in payloads:
+    for i in order:
+        data = payloads[i]
         try:
-            resp = requests.post(uri, data=data, timeout=10)
+            resp = http.post(uri, data=data, timeout=10)
             if resp.status_code == 200:
                 vprint(console, f"[relabel] HTTP ok with payload {data}")
+                _PAYLOAD_SHAPE[uri] = i
                 return
             else:
                 vprint(console, f"[relabel] HTTP {resp.status_code} for payload {data}")
@@ -2,6 +2,7 @@
 """Secrets management for rt_autodl."""
 
 import os
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 from rich.console import Console
@@ -11,6 +12,17 @@ try:
 except ImportError:
     from utils import vprint
 
+# Optional keyring backend, imported once
+try:
+    import keyring  # type: ignore
+    _KEYRING_ERROR = None
+except Exception as e:
+    keyring = None
+    _KEYRING_ERROR = e
+
+# .env paths already loaded this run (None = python-dotenv's default lookup)
+_DOTENV_LOADED = set()
+
 
 def maybe_load_dotenv(cfg: Dict[str, Any], console: Console) -> None:
     """Load environment variables from .env file if configured."""
@@ -19,6 +31,8 @@ def maybe_load_dotenv(cfg: Dict[str, Any], console: Console) -> None:
     if not use_dotenv:
         return
     path = secrets.get("dotenv_path")
+    if path in _DOTENV_LOADED:
+        return
     try:
         from dotenv import load_dotenv  # type: ignore
     except Exception as e:
@@ -29,6 +43,7 @@ def maybe_load_dotenv(cfg: Dict[str, Any], console: Console) -> None:
             load_dotenv(dotenv_path=path, override=False)
         else:
             load_dotenv(override=False)
+        _DOTENV_LOADED.add(path)
         vprint(console, "[secrets] .env loaded")
     except Exception as e:
         vprint(console, f"[secrets] .env load failed: {e!r}")
@@ -44,6 +59,12 @@ def _expand_env(s: Optional[str]) -> Optional[str]:
         return s
 
 
+@lru_cache(maxsize=256)
+def _keyring_password(service: str, item: str) -> Optional[str]:
+    """Keyring lookup, once per (service, item): each one is an IPC round-trip to the keyring daemon."""
+    return keyring.get_password(service, item)  # type: ignore
+
+
 def resolve_secret(val: Optional[str], cfg: Dict[str, Any], *, username: Optional[str] = None, console: Optional[Console] = None) -> Optional[str]:
     """Resolve secret from various sources (env, dotenv, keyring)."""
     if val is None or not isinstance(val, str):
@@ -57,11 +78,9 @@ def resolve_secret(val: Optional[str], cfg: Dict[str, Any], *, username: Optiona
         return out
     if val.startswith("keyring:"):
         token = val.split(":", 1)[1]
-        try:
-            import keyring  # type: ignore
-        except Exception as e:
+        if keyring is None:
             if console:
-                vprint(console, f"[secrets] keyring not available: {e!r}")
+                vprint(console, f"[secrets] keyring not available: {_KEYRING_ERROR!r}")
             return None
         service = None
         item = None
@@ -73,7 +92,7 @@ def resolve_secret(val: Optional[str], cfg: Dict[str, Any], *, username: Optiona
         if not item:
             item = username
         try:
-            return keyring.get_password(service, item)  # type: ignore
+            return _keyring_password(service, item)
         except Exception as e:
             if console:
                 vprint(console, f"[secrets] keyring lookup failed ({service}/{item}): {e!r}")
@@ -4,7 +4,7 @@
 import os
 import posixpath
 import time
-from functools import wraps
+from functools import lru_cache, wraps
 
 from rich.console import Console
 
@@ -21,6 +21,16 @@ def set_flags(verbose: bool = False, dry_run: bool = False) -> None:
     DRY_RUN = dry_run
 
 
+_RETRY_CONSOLE = None  # created on the first verbose retry message
+
+
+def _retry_console() -> Console:
+    global _RETRY_CONSOLE
+    if _RETRY_CONSOLE is None:
+        _RETRY_CONSOLE = Console()
+    return _RETRY_CONSOLE
+
+
 def retry_on_failure(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0):
     """Decorator for retrying failed operations with exponential backoff."""
     def decorator(func):
@@ -36,14 +46,12 @@ def retry_on_failure(max_attempts: int = 3, delay: float = 1.0, backoff: float =
                     last_exception = e
                     if attempt < max_attempts - 1:  # Don't sleep on the last attempt
                         if VERBOSE:
-                            console = Console()
-                            vprint(console, f"[retry] Attempt {attempt + 1} failed: {e!r}, retrying in {current_delay}s")
+                            vprint(_retry_console(), f"[retry] Attempt {attempt + 1} failed: {e!r}, retrying in {current_delay}s")
                         time.sleep(current_delay)
                         current_delay *= backoff
                     else:
                         if VERBOSE:
-                            console = Console()
-                            vprint(console, f"[retry] All {max_attempts} attempts failed")
+                            vprint(_retry_console(), f"[retry] All {max_attempts} attempts failed")
             
             raise last_exception or RuntimeError(f"Function {func.__name__} failed after {max_attempts} attempts")
         return wrapper
@@ -59,17 +67,30 @@ def vprint(console: Console, msg: str) -> None:
             print(msg)
 
 
+# Directories already created (or found) this run; a race only costs a redundant makedirs
+_ENSURED_DIRS = set()
+
+
 def ensure_dir(path: str) -> None:
-    """Create directory if it doesn't exist."""
-    if path:
+    """Create directory if it doesn't exist (at most one makedirs per path per run)."""
+    if path and path not in _ENSURED_DIRS:
         os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
 
 
+@lru_cache(maxsize=4096)
 def posix_norm(p: str) -> str:
     """Normalize to POSIX path (collapse //, ensure forward slashes)."""
-    return posixpath.normpath((p or "").replace("\\", "/"))
+    p = (p or "").replace("\\", "/")
+    # Already-clean paths (the usual case) come back unchanged from normpath
+    if p and "//" not in p and "/." not in p and not p.startswith(".") and (p == "/" or not p.endswith("/")):
+        return p
+    return posixpath.normpath(p)
 
 
 def join_posix(a: str, b: str) -> str:
     """Join POSIX safely and normalize (no double slashes)."""
+    if a and b and not b.startswith("/"):
+        # posixpath.join's result for this case, without its per-call setup
+        return posix_norm(a + b if a.endswith("/") else a + "/" + b)
     return posix_norm(posixpath.join(a or "", b or ""))
\ No newline at end of file